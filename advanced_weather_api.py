@@ -12,6 +12,27 @@ from rich.text import Text
 from rich.markup import escape
 from typing import Optional, Union
 import time
+import threading
+import os
+import re
+import unicodedata
+import mmap
+import struct
+import heapq
+import sys
+import glob
+import argparse
+import cProfile
+import pstats
+import functools
+import json
+from collections import Counter
+from datetime import timedelta
+
+try:
+    import numpy as np
+except ImportError:  # archive reads fall back to mmap + struct
+    np = None
 
 console = Console()
 
@@ -24,6 +45,39 @@ TEMP_UNIT = "C"
 WIND_UNIT = "kmh"
 PRESSURE_UNIT = "hPa"
 
+#-----------------------------------------
+# OPEN-METEO RATE LIMIT / CIRCUIT BREAKER
+#-----------------------------------------
+RATE_LIMIT_PER_SEC = 5.0        # steady request rate allowed towards Open-Meteo
+RATE_LIMIT_BURST = 10           # max requests allowed back-to-back
+RATE_LIMIT_MIN_PER_SEC = 0.2    # floor the limiter backs off to after 429s
+RATE_LIMIT_MAX_WAIT = 2.0       # max seconds a call may wait for a token
+BREAKER_FAILURE_THRESHOLD = 3   # consecutive failures before the breaker opens
+BREAKER_RESET_TIMEOUT = 30.0    # seconds to stay open before a probe call
+API_TIMEOUT = 8                 # per-request timeout (seconds)
+
+#-----------------------------------------
+# BINARY ARCHIVE
+#-----------------------------------------
+ARCHIVE_DIR = "weather_archive"
+ARCHIVE_AFTER_DAYS = 30         # compaction moves SQLite rows older than this
+
+#-----------------------------------------
+# PROFILING (OFF UNLESS ASKED FOR)
+#-----------------------------------------
+# WEATHER_PROFILE="log_weather,view_logs" or "all" (same as --profile on the command line)
+PROFILE_OPS = {op.strip() for op in os.environ.get("WEATHER_PROFILE", "").split(",") if op.strip()}
+PROFILE_DIR = os.environ.get("WEATHER_PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_INTERVAL = 0.005  # seconds between stack samples for the collapsed-stack file
+
+#-----------------------------------------
+# VIEW LOGS OUTPUT MODE
+#-----------------------------------------
+# "auto" -> rich table on a terminal, TSV when stdout is piped/redirected
+# "rich" | "tsv" | "jsonl" | "fixed" force a mode
+VIEW_OUTPUT = "auto"
+VIEW_OUTPUT_MODES = ("auto", "rich", "tsv", "jsonl", "fixed")
+
 
 #====================
 # CONVERSION HELPERS
@@ -119,9 +173,107 @@ def format_pressure(raw_hpa: Optional[float]) -> str:
         return escape(str(raw_hpa))
 
 
+#=====================================================
+# PROFILING HOOKS
+# - @profiled("name") is a no-op unless "name" (or "all") is in PROFILE_OPS
+# - each profiled call writes <PROFILE_DIR>/<name>_<timestamp>.pstats (cProfile)
+#   and .collapsed (sampled stacks, flamegraph.pl / speedscope input)
+#=====================================================
+_profile_state = threading.local()
+PROFILED_OPERATIONS = set()  # every name passed to @profiled, for validating --profile
+
+class _StackSampler(threading.Thread):
+    """Samples one thread's Python stack every `interval` seconds into collapsed-stack counts."""
+    def __init__(self, target_ident: int, interval: float):
+        super().__init__(daemon=True)
+        self.target_ident = target_ident
+        self.interval = interval
+        self.counts = Counter()
+        self.stop_event = threading.Event()
+
+    def run(self):
+        while not self.stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.target_ident)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self.stop_event.set()
+        self.join()
+
+def profiled(name: str):
+    PROFILED_OPERATIONS.add(name)
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not (PROFILE_OPS & {name, "all"}) or getattr(_profile_state, "active", False):
+                return func(*args, **kwargs)
+
+            _profile_state.active = True
+            profiler = cProfile.Profile()
+            sampler = _StackSampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+            sampler.start()
+            profiler.enable()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler.disable()
+                sampler.stop()
+                _profile_state.active = False
+                _write_profile(name, profiler, sampler.counts)
+        return wrapper
+    return decorator
+
+def _write_profile(name: str, profiler: cProfile.Profile, counts: Counter):
+    try:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        stamp = datetime.now(UTC).strftime("%Y%m%dT%H%M%S_%f")
+        base = os.path.join(PROFILE_DIR, f"{name}_{stamp}")
+        profiler.dump_stats(base + ".pstats")
+        with open(base + ".collapsed", "w", encoding="utf-8") as f:
+            for stack, n in counts.most_common():
+                f.write(f"{stack} {n}\n")
+        # stderr, so piped --view-logs output stays clean
+        print(f"⏱️ PROFILE SAVED: {base}.pstats, {base}.collapsed", file=sys.stderr)
+    except OSError as e:
+        print(Fore.RED + f"⚠️ PROFILE WRITE ERROR: {e}")
+
+def profile_report(operation: Optional[str] = None, top: int = 15):
+    """Merge every saved .pstats file (optionally for one operation) and show the top functions."""
+    pattern = f"{operation}_*.pstats" if operation else "*.pstats"
+    files = sorted(glob.glob(os.path.join(PROFILE_DIR, pattern)))
+    if not files:
+        console.print(f"📭 [bold yellow]NO PROFILES FOUND IN {escape(PROFILE_DIR)}/.[/]")
+        return
+
+    stats = pstats.Stats(*files)
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)[:top]
+
+    table = Table(title=f"⏱️ PROFILE REPORT: {escape(operation or 'ALL OPERATIONS')} ({len(files)} runs)",
+                  header_style="bold magenta")
+    table.add_column("CALLS", justify="right", style="cyan")
+    table.add_column("OWN (s)", justify="right")
+    table.add_column("CUMULATIVE (s)", justify="right", style="yellow")
+    table.add_column("FUNCTION", style="white")
+    for (filename, line, func), (_cc, ncalls, tottime, cumtime, _callers) in rows:
+        table.add_row(
+            str(ncalls),
+            f"{tottime:.4f}",
+            f"{cumtime:.4f}",
+            escape(f"{func} ({os.path.basename(filename)}:{line})")
+        )
+    console.print(table)
+
+
 #============================
 # CREATE DATABASE AND TABLE
 #============================
+@profiled("init_db")
 def init_db():
     conn = None
     try:
@@ -163,6 +315,200 @@ def init_db():
             conn.close()
 
 
+#=============================================
+# RATE LIMITER AND CIRCUIT BREAKER (OPEN-METEO)
+#=============================================
+class UpstreamUnavailable(requests.RequestException):
+    """Raised instead of calling Open-Meteo when the limiter or breaker says no."""
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by every Open-Meteo call.
+    A 429 halves the refill rate (and honours Retry-After); every success
+    creeps the rate back up towards RATE_LIMIT_PER_SEC.
+    """
+    def __init__(self, rate: float, burst: int, min_rate: float):
+        self.max_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.throttled = 0
+        self.lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, max_wait: float) -> bool:
+        """Take one token, waiting at most max_wait seconds. False if none in time."""
+        deadline = time.monotonic() + max_wait
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        with self.lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = 0.0
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+    def on_success(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * 0.1)
+
+    def state(self) -> dict:
+        with self.lock:
+            self._refill(time.monotonic())
+            return {
+                "rate": self.rate,
+                "max_rate": self.max_rate,
+                "tokens": self.tokens,
+                "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+                "throttled": self.throttled,
+            }
+
+
+class CircuitBreaker:
+    """
+    CLOSED -> OPEN after `threshold` consecutive failures.
+    OPEN fails fast until `reset_timeout` passes, then lets one probe through (HALF_OPEN).
+    A good probe closes the breaker again, a bad one re-opens it.
+    A probe that never reports back (e.g. refused by the rate limiter) is handed back
+    with release_probe(), or expires after `reset_timeout` so another probe can go.
+    """
+    CLOSED = "CLOSED"
+    OPEN = "OPEN"
+    HALF_OPEN = "HALF_OPEN"
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.status = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probe_started_at = 0.0
+        self.short_circuited = 0
+        self.lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self.lock:
+            if self.status == self.CLOSED:
+                return True
+            now = time.monotonic()
+            if ((self.status == self.OPEN and now - self.opened_at >= self.reset_timeout) or
+                    (self.status == self.HALF_OPEN and now - self.probe_started_at >= self.reset_timeout)):
+                self.status = self.HALF_OPEN
+                self.probe_started_at = now
+                return True
+            self.short_circuited += 1
+            return False
+
+    def release_probe(self):
+        """The admitted probe was never sent: go back to OPEN so the next call can probe."""
+        with self.lock:
+            if self.status == self.HALF_OPEN:
+                self.status = self.OPEN
+
+    def on_success(self):
+        with self.lock:
+            self.status = self.CLOSED
+            self.failures = 0
+
+    def on_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.status == self.HALF_OPEN or self.failures >= self.threshold:
+                self.status = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def state(self) -> dict:
+        with self.lock:
+            retry_in = 0.0
+            if self.status == self.OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.monotonic() - self.opened_at))
+            return {
+                "status": self.status,
+                "failures": self.failures,
+                "retry_in": retry_in,
+                "short_circuited": self.short_circuited,
+            }
+
+
+RATE_LIMITER = AdaptiveRateLimiter(RATE_LIMIT_PER_SEC, RATE_LIMIT_BURST, RATE_LIMIT_MIN_PER_SEC)
+BREAKER = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+
+
+def _retry_after_seconds(resp) -> Optional[float]:
+    value = resp.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def open_meteo_get(url: str, params: dict, timeout: float = API_TIMEOUT):
+    """
+    requests.get() wrapped with the shared rate limiter and circuit breaker.
+    Raises UpstreamUnavailable (a RequestException) instead of waiting on a sick API.
+    """
+    if not BREAKER.allow():
+        raise UpstreamUnavailable("OPEN-METEO CIRCUIT OPEN: SKIPPING CALL")
+    if not RATE_LIMITER.acquire(RATE_LIMIT_MAX_WAIT):
+        BREAKER.release_probe()
+        raise UpstreamUnavailable("OPEN-METEO RATE LIMIT: NO TOKEN AVAILABLE")
+    try:
+        resp = requests.get(url, params=params, timeout=timeout)
+    except requests.RequestException:
+        BREAKER.on_failure()
+        raise
+    if resp.status_code == 429:
+        RATE_LIMITER.on_throttled(_retry_after_seconds(resp))
+        BREAKER.on_failure()
+    elif resp.status_code >= 500:
+        BREAKER.on_failure()
+    else:
+        RATE_LIMITER.on_success()
+        BREAKER.on_success()
+    resp.raise_for_status()
+    return resp
+
+
+def view_api_health():
+    """Show the Open-Meteo rate limiter and circuit breaker state."""
+    limiter = RATE_LIMITER.state()
+    breaker = BREAKER.state()
+    color = {"CLOSED": "green", "HALF_OPEN": "yellow", "OPEN": "red"}[breaker["status"]]
+
+    table = Table(title="🩺 OPEN-METEO API HEALTH")
+    table.add_column("SETTING", style="cyan")
+    table.add_column("VALUE", style="white")
+    table.add_row("CIRCUIT", f"[{color}]{breaker['status']}[/{color}]")
+    table.add_row("CONSECUTIVE FAILURES", f"{breaker['failures']} / {BREAKER_FAILURE_THRESHOLD}")
+    table.add_row("PROBE IN", f"{breaker['retry_in']:.1f} s")
+    table.add_row("CALLS SHORT-CIRCUITED", str(breaker["short_circuited"]))
+    table.add_row("RATE (REQ/S)", f"{limiter['rate']:.2f} / {limiter['max_rate']:.2f}")
+    table.add_row("TOKENS AVAILABLE", f"{limiter['tokens']:.1f} / {RATE_LIMIT_BURST}")
+    table.add_row("RETRY-AFTER BLOCK", f"{limiter['blocked_for']:.1f} s")
+    table.add_row("429 RESPONSES", str(limiter["throttled"]))
+    console.print(table)
+
+
 #==================================================
 # GEOCODE CITY -- LAT/LON (OPEN-METEO GEOCODING)
 #==================================================
@@ -175,8 +521,7 @@ def  geocode_city(city_name: str):
     try:
         url = f"https://geocoding-api.open-meteo.com/v1/search?"
         params = {"name": city_name, "count":1, "language": "en", "format": "json"}
-        resp = requests.get(url, params=params, timeout=8)
-        resp.raise_for_status()
+        resp = open_meteo_get(url, params)
         data = resp.json()
         results = data.get("results")
         if not results:
@@ -209,8 +554,7 @@ def fetch_weather(latitude=DEFAULT_LAT, longitude=DEFAULT_LON):
             "timezone": "UTC"
         }
         with console.status("[bold blue]Fetching Weather...[/bold blue]", spinner="dots"):
-            resp = requests.get(url, params=params, timeout=10)
-            resp.raise_for_status()
+            resp = open_meteo_get(url, params, timeout=10)
             data = resp.json()
         
 
@@ -253,6 +597,7 @@ def fetch_weather(latitude=DEFAULT_LAT, longitude=DEFAULT_LON):
 #==================================
 # LOGGING WEATHER TO DATABASE
 #===================================
+@profiled("log_weather")
 def log_weather(city: Optional[str] = None, latitude: Optional[float] = None, longitude: Optional[float] = None):
      """
     Main logger. If city provided but no coords -> geocode.
@@ -327,7 +672,69 @@ def log_weather(city: Optional[str] = None, latitude: Optional[float] = None, lo
 #===========================
 # VIEW LOGS
 #============================
-def view_logs(limit: Optional[int] = None, search_city: Optional[str] = None, search_date: Optional[str] = None):
+#--------------------------------------------------------------
+# PLAIN OUTPUT WRITERS (NO MARKUP, STREAMED FROM THE CURSOR)
+# values are in the chosen display units, same as the CSV export
+#--------------------------------------------------------------
+LOG_COLUMNS = ("ID", "CITY", "LATITUDE", "LONGITUDE", "TEMPERATURE", "WINDSPEED", "HUMIDITY", "PRESSURE", "DATE")
+
+_CONTROL_CHARS = str.maketrans({"\t": " ", "\r": " ", "\n": " "})
+
+def _plain_text(value):
+    """Text field with tabs/newlines flattened so one row stays one line."""
+    return None if value is None else str(value).translate(_CONTROL_CHARS)
+
+def _display_values(row):
+    _id, city, lat, lon, temp, wind, hum, pres, dt = row
+    return (
+        _id,
+        _plain_text(city),
+        None if lat is None else round(lat, 6),
+        None if lon is None else round(lon, 6),
+        None if temp is None else round(temp_to_display(temp), 2),
+        None if wind is None else round(wind_to_display(wind), 2),
+        None if hum is None else round(hum, 1),
+        None if pres is None else round(pressure_to_display(pres), 2),
+        _plain_text(dt)
+    )
+
+def _write_tsv(rows, out):
+    out.write("\t".join(LOG_COLUMNS) + "\n")
+    out.writelines(
+        "\t".join("" if v is None else str(v) for v in _display_values(r)) + "\n"
+        for r in rows
+    )
+
+def _write_jsonl(rows, out):
+    keys = [c.lower() for c in LOG_COLUMNS]
+    out.writelines(json.dumps(dict(zip(keys, _display_values(r))), ensure_ascii=False) + "\n" for r in rows)
+
+def _write_fixed(rows, out):
+    line = "{:>7} {:<20.20} {:>9} {:>10} {:>8} {:>8} {:>5} {:>8} {}\n"
+    out.write(line.format("ID", "CITY", "LAT", "LON", "TEMP", "WIND", "HUM", "PRES", "DATE (UTC)"))
+    for r in rows:
+        out.write(line.format(*("N/A" if v is None else str(v) for v in _display_values(r))))
+
+PLAIN_WRITERS = {"tsv": _write_tsv, "jsonl": _write_jsonl, "fixed": _write_fixed}
+
+def resolve_output_mode(output: Optional[str] = None) -> str:
+    mode = (output or VIEW_OUTPUT).lower()
+    if mode not in VIEW_OUTPUT_MODES:
+        raise ValueError(f"UNKNOWN OUTPUT MODE '{mode}' (choose from {', '.join(VIEW_OUTPUT_MODES)})")
+    if mode == "auto":
+        return "rich" if sys.stdout.isatty() else "tsv"
+    return mode
+
+
+@profiled("view_logs")
+def view_logs(limit: Optional[int] = None, search_city: Optional[str] = None, search_date: Optional[str] = None,
+              output: Optional[str] = None):
+    """
+    output: "rich", "tsv", "jsonl", "fixed" or "auto" (default VIEW_OUTPUT).
+    The plain modes stream rows straight from the cursor to stdout.
+    """
+    conn = None
+    mode = resolve_output_mode(output)
     try:
         conn = sqlite3.connect(DB_PATH)
         cur = conn.cursor()
@@ -343,6 +750,12 @@ def view_logs(limit: Optional[int] = None, search_city: Optional[str] = None, se
         if limit:
             sql += f" LIMIT {int(limit)}"
         cur.execute(sql, params)
+
+        if mode in PLAIN_WRITERS:
+            PLAIN_WRITERS[mode](cur, sys.stdout)
+            sys.stdout.flush()
+            return
+
         rows = cur.fetchall()
         
         if not rows:
@@ -378,8 +791,15 @@ def view_logs(limit: Optional[int] = None, search_city: Optional[str] = None, se
         console.print(table)
 
 
+    except BrokenPipeError:
+        # reader went away (e.g. piped into head): silence the final flush at exit
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
     except sqlite3.Error as e:
-        console.print(f"⚠️ [red]DATABASE READ ERROR:[/] {e}")
+        if mode in PLAIN_WRITERS:
+            print(f"⚠️ DATABASE READ ERROR: {e}", file=sys.stderr)  # keep stdout clean for pipes
+        else:
+            console.print(f"⚠️ [red]DATABASE READ ERROR:[/] {e}")
     finally:
         try:
             conn.close()
@@ -389,6 +809,7 @@ def view_logs(limit: Optional[int] = None, search_city: Optional[str] = None, se
 #===================
 # EXPORT TO CSV
 #===================
+@profiled("export_to_csv")
 def export_to_csv(filepath: str = "ADVANCED_WEATHER_LOGS.csv"):
     try:
         conn = sqlite3.connect(DB_PATH)
@@ -434,6 +855,267 @@ def export_to_csv(filepath: str = "ADVANCED_WEATHER_LOGS.csv"):
             pass
 
 
+#=====================================================
+# BINARY TIME-SERIES ARCHIVE
+# - one append-only file per city: <ARCHIVE_DIR>/<city>.bin
+#   plus <city>.json listing every city name / coordinate pair stored in it
+# - fixed 24-byte records, little endian, sorted by time:
+#   epoch seconds (int64), temperature, windspeed, humidity, pressure (float32)
+# - missing metrics are stored as NaN
+#=====================================================
+ARCHIVE_RECORD = struct.Struct("<q4f")
+ARCHIVE_FIELDS = ("epoch", "temperature", "windspeed", "humidity", "pressure")
+if np is not None:
+    ARCHIVE_DTYPE = np.dtype([("epoch", "<i8"), ("temperature", "<f4"), ("windspeed", "<f4"),
+                              ("humidity", "<f4"), ("pressure", "<f4")])
+
+def archive_path(city: str) -> str:
+    """
+    Unicode-aware file name for a city: accents are folded ("São Paulo" -> "sao_paulo"),
+    other scripts are kept ("東京" -> "東京").
+    """
+    folded = "".join(c for c in unicodedata.normalize("NFKD", str(city)) if not unicodedata.combining(c))
+    slug = re.sub(r"[\W_]+", "_", folded.casefold()).strip("_") or "unknown"
+    return os.path.join(ARCHIVE_DIR, f"{slug}.bin")
+
+def _location_path(city: str) -> str:
+    return os.path.splitext(archive_path(city))[0] + ".json"
+
+def read_archive_locations(city: str) -> list:
+    """
+    [{"city", "latitude", "longitude"}, ...] for every distinct location whose readings
+    went into this city's archive (names that slug alike share one file).
+    """
+    try:
+        with open(_location_path(city), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return []
+    if "locations" not in meta:  # single-location format written before the list existed
+        return [meta] if meta.get("city") else []
+    return meta["locations"]
+
+def _write_archive_locations(city: str, locations):
+    """Add (latitude, longitude) pairs for `city`, one entry per distinct name and rounded pair."""
+    entries = read_archive_locations(city)
+    known = {(e.get("city"), e.get("latitude"), e.get("longitude")) for e in entries}
+    if not locations and any(e.get("city") == city for e in entries):
+        locations = []  # name already listed, nothing new to record
+    elif not locations:
+        locations = [(None, None)]
+    for lat, lon in locations:
+        key = (city, None if lat is None else round(lat, 4), None if lon is None else round(lon, 4))
+        if key not in known:
+            known.add(key)
+            entries.append({"city": key[0], "latitude": key[1], "longitude": key[2]})
+    tmp = _location_path(city) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"locations": entries}, f, ensure_ascii=False)
+    os.replace(tmp, _location_path(city))
+
+def _to_epoch(date_text: str) -> int:
+    return int(datetime.strptime(date_text, "%Y-%m-%d %H:%M:%S").replace(tzinfo=UTC).timestamp())
+
+def _nan_if_none(v: Optional[float]) -> float:
+    return float("nan") if v is None else float(v)
+
+def _archive_epoch_at(buf, idx: int) -> int:
+    return struct.unpack_from("<q", buf, idx * ARCHIVE_RECORD.size)[0]
+
+def _archive_bisect(buf, count: int, epoch: int) -> int:
+    """First record index whose epoch is >= epoch (records are time sorted)."""
+    lo, hi = 0, count
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _archive_epoch_at(buf, mid) < epoch:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+def append_archive(city: str, records: list, locations: Optional[list] = None):
+    """
+    Append (epoch, temp, wind, hum, pres) tuples to a city's archive.
+    A record is skipped only if an identical record (epoch and all four metrics) is already
+    archived, so re-running an interrupted compaction does not duplicate readings while
+    distinct readings that share an epoch are all kept.
+    Records older than the file's last entry trigger a rewrite of the file from the first
+    affected record onwards so range reads stay valid.
+    The city name and each (latitude, longitude) in `locations` are kept in the .json file
+    next to the archive.
+    """
+    if not records:
+        return
+    size = ARCHIVE_RECORD.size
+    packed = sorted({ARCHIVE_RECORD.pack(int(r[0]), *(_nan_if_none(v) for v in r[1:5])) for r in records},
+                    key=lambda rec: (_archive_epoch_at(rec, 0), rec))
+    os.makedirs(ARCHIVE_DIR, exist_ok=True)
+    _write_archive_locations(city, locations)
+    path = archive_path(city)
+    count = (os.path.getsize(path) if os.path.exists(path) else 0) // size
+    tmp = None
+
+    if count:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), count * size, access=mmap.ACCESS_READ) as buf:
+            # only the archived records inside the incoming epoch range can be duplicates
+            i = _archive_bisect(buf, count, _archive_epoch_at(packed[0], 0))
+            j = _archive_bisect(buf, count, _archive_epoch_at(packed[-1], 0) + 1)
+            archived = {buf[k * size:(k + 1) * size] for k in range(i, j)}
+            packed = [rec for rec in packed if rec not in archived]
+            if not packed:
+                return
+
+            if _archive_epoch_at(packed[0], 0) < _archive_epoch_at(buf, count - 1):
+                # keep the prefix as raw bytes, merge only the tail the new records fall into
+                i = _archive_bisect(buf, count, _archive_epoch_at(packed[0], 0))
+                tail = (buf[k * size:(k + 1) * size] for k in range(i, count))
+                tmp = path + ".tmp"
+                with open(tmp, "wb") as out:
+                    out.write(buf[:i * size])
+                    out.write(b"".join(heapq.merge(tail, packed, key=lambda rec: _archive_epoch_at(rec, 0))))
+                    out.flush()
+                    os.fsync(out.fileno())
+
+    if tmp:
+        os.replace(tmp, path)  # after the mmap is closed
+        return
+
+    with open(path, "ab") as f:
+        f.truncate(count * size)  # drop any torn tail record
+        f.write(b"".join(packed))
+        f.flush()
+        os.fsync(f.fileno())
+
+def read_archive(city: str, start: Optional[str] = None, end: Optional[str] = None):
+    """
+    Records for a city between start and end (inclusive, 'YYYY-MM-DD' or 'YYYY-MM-DD HH:MM:SS').
+    With numpy: a zero-copy numpy.memmap slice (structured array, ARCHIVE_DTYPE).
+    Without numpy: a list of (epoch, temp, wind, hum, pres) tuples read through mmap.
+    Returns None if the city has no archive.
+    """
+    path = archive_path(city)
+    if not os.path.exists(path):
+        return None
+    count = os.path.getsize(path) // ARCHIVE_RECORD.size
+    if count == 0:
+        return np.empty(0, dtype=ARCHIVE_DTYPE) if np is not None else []
+
+    lo_epoch = _to_epoch(start if " " in start else f"{start} 00:00:00") if start else None
+    hi_epoch = _to_epoch(end if " " in end else f"{end} 23:59:59") if end else None
+
+    if np is not None:
+        data = np.memmap(path, dtype=ARCHIVE_DTYPE, mode="r", shape=(count,))
+        i = int(np.searchsorted(data["epoch"], lo_epoch, side="left")) if lo_epoch is not None else 0
+        j = int(np.searchsorted(data["epoch"], hi_epoch, side="right")) if hi_epoch is not None else count
+        return data[i:j]
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        i = _archive_bisect(buf, count, lo_epoch) if lo_epoch is not None else 0
+        j = _archive_bisect(buf, count, hi_epoch + 1) if hi_epoch is not None else count
+        view = memoryview(buf)[i * ARCHIVE_RECORD.size:j * ARCHIVE_RECORD.size]
+        try:
+            return list(ARCHIVE_RECORD.iter_unpack(view))
+        finally:
+            view.release()
+
+@profiled("compact_to_archive")
+def compact_to_archive(older_than_days: int = ARCHIVE_AFTER_DAYS):
+    """
+    Move ADVANCED_WEATHER_LOG rows older than `older_than_days` into the binary archive.
+    Archive files are fsynced before the rows are deleted from SQLite.
+    """
+    conn = None
+    try:
+        cutoff = (datetime.now(UTC) - timedelta(days=older_than_days)).strftime("%Y-%m-%d %H:%M:%S")
+        conn = sqlite3.connect(DB_PATH)
+        cur = conn.cursor()
+        cur.execute("""
+            SELECT ID, CITY, LATITUDE, LONGITUDE, TEMPERATURE, WINDSPEED, HUMIDITY, PRESSURE, DATE
+            FROM ADVANCED_WEATHER_LOG
+            WHERE DATE < ?
+            ORDER BY DATE
+        """, (cutoff,))
+
+        by_city = {}
+        coords = {}
+        ids = []
+        for _id, city, lat, lon, temp, wind, hum, pres, dt in cur:
+            try:
+                epoch = _to_epoch(dt)
+            except (TypeError, ValueError):
+                continue  # leave malformed rows in SQLite
+            city = city or DEFAULT_CITY
+            by_city.setdefault(city, []).append((epoch, temp, wind, hum, pres))
+            if lat is not None and lon is not None:
+                coords.setdefault(city, set()).add((lat, lon))
+            ids.append((_id,))
+
+        if not ids:
+            print(Fore.YELLOW + f"📭 NO LOGS OLDER THAN {older_than_days} DAYS TO ARCHIVE.")
+            return
+
+        for city, records in by_city.items():
+            append_archive(city, records, sorted(coords.get(city, ())))
+
+        cur.executemany("DELETE FROM ADVANCED_WEATHER_LOG WHERE ID = ?", ids)
+        conn.commit()
+        print(Fore.GREEN + f"🗜️ ARCHIVED {len(ids)} rows for {len(by_city)} city name(s) into {ARCHIVE_DIR}/")
+    except (sqlite3.Error, OSError) as e:
+        print(Fore.RED + f"⚠️ ARCHIVE COMPACTION ERROR: {e}")
+        log_error("compact_to_archive", str(e))
+    finally:
+        if conn:
+            conn.close()
+
+def archive_trend(city: str, start: Optional[str] = None, end: Optional[str] = None):
+    """Print record count and min/mean/max per metric for a city's archived range."""
+    try:
+        data = read_archive(city, start, end)
+    except ValueError:
+        console.print("[yellow]⚠️ INVALID DATE: USE YYYY-MM-DD (OR YYYY-MM-DD HH:MM:SS).[/yellow]")
+        return
+    if data is None or len(data) == 0:
+        console.print(f"📭 [bold yellow]NO ARCHIVED DATA FOR {escape(city)}.[/]")
+        return
+
+    table = Table(title=f"📈 ARCHIVE TREND: {escape(city)}", header_style="bold magenta")
+    table.add_column("METRIC", style="cyan")
+    table.add_column("MIN", justify="right")
+    table.add_column("MEAN", justify="right")
+    table.add_column("MAX", justify="right")
+
+    if np is not None:
+        first, last = int(data["epoch"][0]), int(data["epoch"][-1])
+        columns = {name: data[name] for name in ARCHIVE_FIELDS[1:]}
+    else:
+        first, last = data[0][0], data[-1][0]
+        columns = {name: [r[i] for r in data] for i, name in enumerate(ARCHIVE_FIELDS) if i}
+
+    for name, values in columns.items():
+        if np is not None:
+            values = values[~np.isnan(values)]
+            stats = (float(values.min()), float(values.mean()), float(values.max())) if values.size else None
+        else:
+            values = [v for v in values if v == v]
+            stats = (min(values), sum(values) / len(values), max(values)) if values else None
+        if stats is None:
+            table.add_row(name.upper(), "N/A", "N/A", "N/A")
+        else:
+            table.add_row(name.upper(), *(f"{v:.1f}" for v in stats))
+
+    console.print(table)
+    console.print(
+        f"{len(data)} records from "
+        f"{datetime.fromtimestamp(first, UTC):%Y-%m-%d %H:%M:%S} to "
+        f"{datetime.fromtimestamp(last, UTC):%Y-%m-%d %H:%M:%S} (UTC), raw units",
+        style="green"
+    )
+    for location in read_archive_locations(city):
+        coords = "unknown coordinates" if location.get("latitude") is None else \
+            f"{location['latitude']:.4f}, {location['longitude']:.4f}"
+        console.print(f"LOCATION: {escape(str(location.get('city')))} ({coords})", style="green")
+
+
 #==================================
 # ERROR LOGGING HELPER
 #==================================
@@ -519,9 +1201,12 @@ def main():
         console.print("4. SEARCH LOGS BY CITY/DATE")
         console.print("5. EXPORT LOGS TO CSV")
         console.print("6. VIEW ERROR LOGS")
-        console.print("7. EXIT")
+        console.print("7. VIEW API HEALTH")
+        console.print("8. COMPACT OLD LOGS INTO ARCHIVE")
+        console.print("9. ARCHIVE TREND BY CITY")
+        console.print("10. EXIT")
     
-        choice = input(Fore.CYAN + "CHOOSE AN OPTION (1-7): ").strip()
+        choice = input(Fore.CYAN + "CHOOSE AN OPTION (1-10): ").strip()
 
         if choice == "1":
             with console.status("[bold green]Fetching Weather...[/]", spinner="earth"):
@@ -550,6 +1235,19 @@ def main():
             view_error_logs()
 
         elif choice == "7":
+            view_api_health()
+
+        elif choice == "8":
+            days = Prompt.ask("🗜️ ARCHIVE LOGS OLDER THAN (DAYS)", default=str(ARCHIVE_AFTER_DAYS))
+            compact_to_archive(int(days) if days.isdigit() else ARCHIVE_AFTER_DAYS)
+
+        elif choice == "9":
+            city = Prompt.ask("🔍 ENTER CITY", default=DEFAULT_CITY)
+            start = Prompt.ask("📅 FROM DATE (YYYY-MM-DD OR BLANK)", default="")
+            end = Prompt.ask("📅 TO DATE (YYYY-MM-DD OR BLANK)", default="")
+            archive_trend(city, start or None, end or None)
+
+        elif choice == "10":
             console.print("👋 GOODBYE", style="bold red")
             break
         else:
@@ -557,7 +1255,36 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Advanced weather logger")
+    parser.add_argument("--profile", metavar="OPS",
+                        help="comma-separated operations to profile (e.g. log_weather,view_logs) or 'all'")
+    parser.add_argument("--profile-report", nargs="?", const="", metavar="OP",
+                        help="summarise saved profiles (optionally for one operation) and exit")
+    parser.add_argument("--view-logs", action="store_true",
+                        help="print logs without the menu (for piping into other tools) and exit")
+    parser.add_argument("--limit", type=int, help="with --view-logs: max rows")
+    parser.add_argument("--city", help="with --view-logs: filter by city")
+    parser.add_argument("--date", help="with --view-logs: filter by date (YYYY-MM-DD)")
+    parser.add_argument("--output", choices=VIEW_OUTPUT_MODES, default=VIEW_OUTPUT,
+                        help="view logs output mode (auto = rich on a terminal, tsv when piped)")
+    args = parser.parse_args()
+    VIEW_OUTPUT = args.output
+
+    if args.profile:
+        PROFILE_OPS |= {op.strip() for op in args.profile.split(",") if op.strip()}
+    unknown_ops = PROFILE_OPS - PROFILED_OPERATIONS - {"all"}
+    if unknown_ops:
+        parser.error(
+            f"unknown operation(s) in --profile/WEATHER_PROFILE: {', '.join(sorted(unknown_ops))} "
+            f"(choose from: all, {', '.join(sorted(PROFILED_OPERATIONS))})"
+        )
+    if args.profile_report is not None:
+        profile_report(args.profile_report or None)
+    elif args.view_logs:
+        init_db()
+        view_logs(limit=args.limit, search_city=args.city, search_date=args.date)
+    else:
+        main()
 
 
 
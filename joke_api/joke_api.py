@@ -1,8 +1,16 @@
+import sys
 import requests
 import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, UTC
+from requests.adapters import HTTPAdapter
 
 DB_NAME = "jokes.db"
+RANDOM_TEN_URL = "https://official-joke-api.appspot.com/random_ten"
+
+HARVEST_WORKERS = 8         # concurrent random_ten requests per round
+HARVEST_MIN_YIELD = 0.05    # stop once fewer than 5% of fetched jokes are new
+HARVEST_MAX_ROUNDS = 100    # hard stop, whatever the yield
 
 def create_table():
     """Create the jokes table if it doesn't exist."""
@@ -57,22 +65,114 @@ def save_jokes():
     conn.close()
     print(f"✅ {count} new jokes saved into {DB_NAME}")
 
-def view_jokes():
-    """Retrieve and display all saved jokes."""
+def _make_session(pool_size):
+    """Session with a connection pool big enough for every harvest worker."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+def _fetch_batch(session):
+    """One random_ten call; returns a list of joke dicts ([] on any error)."""
+    try:
+        response = session.get(RANDOM_TEN_URL, timeout=10)
+        response.raise_for_status()
+        jokes = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print("Error fetching jokes:", e)
+        return []
+    if not isinstance(jokes, list):
+        # error payloads come back as a JSON object, e.g. {"type": "error", ...}
+        print("Error fetching jokes: unexpected response", jokes)
+        return []
+    return [joke for joke in jokes if isinstance(joke, dict)]
+
+def harvest_jokes(workers=HARVEST_WORKERS, min_yield=HARVEST_MIN_YIELD, max_rounds=HARVEST_MAX_ROUNDS):
+    """
+    Build up the local corpus: each round fetches `workers` batches concurrently over a
+    pooled session, keeps every joke returned, and writes them in one
+    INSERT OR IGNORE transaction. Stops once the share of new jokes in a round
+    drops below `min_yield`.
+    """
     conn = sqlite3.connect(DB_NAME)
     cursor = conn.cursor()
-    cursor.execute("SELECT id, type, setup, punchline, fetched_at FROM jokes")
-    rows = cursor.fetchall()
-    conn.close()
+    total = 0
+
+    try:
+        with _make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+            for round_no in range(1, max_rounds + 1):
+                batches = pool.map(lambda _: _fetch_batch(session), range(workers))
+                fetched_at = datetime.now(UTC).strftime("%Y-%m-%d %H:%M:%S")
+                unique = {}
+                for batch in batches:
+                    for joke in batch:
+                        if joke.get("setup") and joke.get("punchline"):
+                            unique[joke.get("id")] = joke
+                if not unique:
+                    print("No jokes returned, stopping harvest.")
+                    break
+
+                before = conn.total_changes
+                with conn:
+                    cursor.executemany("""
+                    INSERT OR IGNORE INTO jokes (api_id, type, setup, punchline, fetched_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    """, [
+                        (j.get("id"), j.get("type"), j.get("setup"), j.get("punchline"), fetched_at)
+                        for j in unique.values()
+                    ])
+                new = conn.total_changes - before
+                total += new
+                yield_ratio = new / len(unique)
+                print(f"Round {round_no}: {len(unique)} fetched, {new} new ({yield_ratio:.0%})")
+                if yield_ratio < min_yield:
+                    break
+    finally:
+        conn.close()
+
+    print(f"✅ {total} new jokes harvested into {DB_NAME}")
+    return total
+
+def view_jokes(page_size=50, page=None):
+    """
+    Display saved jokes, streamed from the cursor `page_size` rows at a time.
+    Pass `page` (1-based) to print just that page.
+    """
+    conn = sqlite3.connect(DB_NAME)
+    cursor = conn.cursor()
+    sql = "SELECT id, type, setup, punchline, fetched_at FROM jokes ORDER BY id"
+    if page is not None:
+        cursor.execute(sql + " LIMIT ? OFFSET ?", (page_size, (max(page, 1) - 1) * page_size))
+        page_no = max(page, 1)
+    else:
+        cursor.execute(sql)
+        page_no = 1
 
     print("\n--- Saved Jokes ---")
-    for row in rows:
-        print(f"[{row[0]}] ({row[1]}) {row[2]} - {row[3]} (saved at {row[4]})")
+    while True:
+        rows = cursor.fetchmany(page_size)
+        if not rows:
+            break
+        print(f"-- Page {page_no} --")
+        for row in rows:
+            print(f"[{row[0]}] ({row[1]}) {row[2]} - {row[3]} (saved at {row[4]})")
+        page_no += 1
+    conn.close()
 
 # Run everything
+#   python joke_api.py            -> save a few jokes and list them
+#   python joke_api.py harvest    -> fetch until few new jokes turn up
+#   python joke_api.py view [N]   -> list jokes (only page N if given)
 if __name__ == "__main__":
     create_table()
-    save_jokes()
-    view_jokes()
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command == "harvest":
+        harvest_jokes()
+    elif command == "view":
+        view_jokes(page=int(sys.argv[2]) if len(sys.argv) > 2 else None)
+    else:
+        save_jokes()
+        view_jokes()
 
 